@@ -1,12 +1,19 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, validator
 import asyncpg
 import httpx
+import numpy as np
+from pgvector.asyncpg import register_vector
 import os
-import json
+import orjson
+import hashlib
+import functools
+import logging
+import logging.handlers
+import queue
 from typing import Optional, List
-import docker
 from datetime import datetime
 import uuid
 import re
@@ -15,63 +22,84 @@ import asyncio
 import time
 from fastapi import WebSocket, WebSocketDisconnect
 
-app = FastAPI()
+# Non-blocking logging: records go through an unbounded queue and a
+# background listener thread, so slow/unbuffered stdout can't stall
+# coroutines the way a bare print() does
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)])
+logger = logging.getLogger("llm-app")
+
+# orjson serializes datetimes/UUIDs natively and is several times
+# faster than the stdlib encoder on list-of-row payloads
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Allow CORS for the frontend. Explicit origins (rather than "*") plus
+# a long max_age let browsers cache the preflight for a day instead of
+# paying an OPTIONS round trip per non-simple request.
+CORS_ORIGINS = os.getenv(
+    "CORS_ORIGINS",
+    "http://localhost:5173,http://localhost:3000,http://localhost"
+).split(",")
 
-# Allow CORS for frontend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    # The streaming chat endpoint returns the auto-created session id
+    # in this header; without exposing it, cross-origin JS can't read it
+    expose_headers=["X-Session-Id"],
+    max_age=86400,
 )
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/postgres")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
 
-# Initialize database tables
-async def init_db():
-    try:
-        conn = await asyncpg.connect(DATABASE_URL)
-        
-        # Enable vector extension
-        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-        
-        # Create chat sessions table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS chat_sessions (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                title TEXT,
-                created_at TIMESTAMP DEFAULT NOW(),
-                updated_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        
-        # Create messages table with vector embeddings and performance data
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS messages (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                session_id UUID REFERENCES chat_sessions(id) ON DELETE CASCADE,
-                role TEXT NOT NULL CHECK (role IN ('user', 'ai')),
-                content TEXT NOT NULL,
-                embedding vector(384),
-                performance_data JSONB,
-                created_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        
-        # Create index for vector similarity search
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS messages_embedding_idx 
-            ON messages 
-            USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 100);
-        """)
-        
-        await conn.close()
-        print("Database initialized successfully")
-    except Exception as e:
-        print(f"Database initialization error: {e}")
+# asyncpg caches prepared statements per connection, so the fixed-shape
+# hot queries (message insert, context fetch, session update) skip
+# parse/plan after their first use on each pooled connection. Behind
+# pgbouncer in transaction mode prepared statements don't survive
+# pooling, so the cache must be disabled there.
+_STATEMENT_CACHE_SIZE = int(os.getenv(
+    "DB_STATEMENT_CACHE_SIZE",
+    "0" if "pgbouncer" in DATABASE_URL else "256"
+))
+
+async def _init_pg_connection(conn):
+    # Binary pgvector codec: embeddings travel as packed floats instead
+    # of a ~6 KB text literal Postgres has to re-parse
+    await register_vector(conn)
+    # JSONB as plain dicts both ways, encoded with orjson, so handlers
+    # never json.dumps/loads performance_data themselves
+    await conn.set_type_codec(
+        'jsonb',
+        encoder=lambda v: orjson.dumps(v).decode(),
+        decoder=orjson.loads,
+        schema='pg_catalog',
+        format='text',
+    )
+
+# Shared asyncpg connection pool (created on startup) so requests reuse
+# warm connections instead of paying a full handshake per request
+async def create_db_pool():
+    return await asyncpg.create_pool(
+        dsn=DATABASE_URL,
+        min_size=5,
+        max_size=20,
+        command_timeout=30,
+        max_inactive_connection_lifetime=300,
+        statement_cache_size=_STATEMENT_CACHE_SIZE,
+        server_settings={'application_name': 'llm-app'},
+        init=_init_pg_connection,
+    )
+
+# Schema DDL lives in backend/migrations/ and is applied by the
+# `migrate` compose service before the API starts, so startup only has
+# to warm the pool.
 
 # Pydantic models
 class ChatRequest(BaseModel):
@@ -92,6 +120,17 @@ class Session(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+def _parse_performance_data(v):
+    """The jsonb codec hands back dicts; tolerate stray string values."""
+    if v is None:
+        return None
+    if isinstance(v, str):
+        try:
+            return orjson.loads(v)
+        except orjson.JSONDecodeError:
+            return None
+    return v
+
 class Message(BaseModel):
     id: str
     session_id: str
@@ -102,149 +141,221 @@ class Message(BaseModel):
 
     @validator('performance_data', pre=True)
     def parse_performance_data(cls, v):
-        if v is None:
-            return None
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
-# Simple embedding function (placeholder - in production, use a proper embedding model)
-def get_embedding(text: str) -> str:
-    # This is a simple hash-based embedding for demo purposes
-    # In production, use a proper embedding model like sentence-transformers
-    import hashlib
-    hash_obj = hashlib.md5(text.encode())
-    hash_bytes = hash_obj.digest()
-    # Convert to 384-dimensional vector (simple approach)
-    embedding = []
-    for i in range(384):
-        embedding.append((hash_bytes[i % 16] / 255.0) * 2 - 1)
-    # Convert to PostgreSQL vector format
-    return '[' + ','.join(map(str, embedding)) + ']'
+        return _parse_performance_data(v)
+
+# Real sentence embeddings when the model is available. all-MiniLM-L6-v2
+# is 384-dim, matching the vector(384) column, so hash and model vectors
+# coexist in the same table. The dependency is optional to keep the
+# default image slim — without it the hash fallback keeps the demo
+# working (but gives the HNSW index nothing meaningful to rank).
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+try:
+    from sentence_transformers import SentenceTransformer
+    _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+    logger.info(f"Loaded embedding model {EMBEDDING_MODEL}")
+except ImportError:
+    _embedding_model = None
+except Exception as e:
+    # Installed but unusable (no network, bad EMBEDDING_MODEL, ...):
+    # fall back to the hash embedding rather than failing boot
+    logger.warning(f"Could not load embedding model {EMBEDDING_MODEL}: {e}")
+    _embedding_model = None
+
+# Embedding function; hash-based fallback when no model is installed
+@functools.lru_cache(maxsize=4096)
+def get_embedding(text: str) -> np.ndarray:
+    if _embedding_model is not None:
+        embedding = _embedding_model.encode(text, normalize_embeddings=True).astype(np.float32)
+    else:
+        # Simple hash-based embedding for demo purposes
+        hash_bytes = np.frombuffer(hashlib.md5(text.encode()).digest(), dtype=np.uint8)
+        # Tile the 16 hash bytes to a 384-dimensional vector in one vectorized pass
+        embedding = ((np.tile(hash_bytes, 24) / 255.0) * 2 - 1).astype(np.float32)
+    # Cached arrays are shared across callers; guard against mutation
+    embedding.setflags(write=False)
+    return embedding
+
+# Category keyword sets: the query is tokenized once and intersected
+# against these instead of running a substring scan per keyword
+_TOKEN_RE = re.compile(r'[a-z&]+')
+_SPORTS_WORDS = frozenset({'barcelona', 'madrid', 'football', 'soccer', 'game', 'match', 'schedule'})
+_FINANCE_WORDS = frozenset({'stock', 'market', 'trading', 'finance', 'financial',
+                            'nasdaq', 'nyse', 'dow', 'crypto', 'bitcoin', 'ethereum'})
+_SPORTS_FALLBACK_WORDS = _SPORTS_WORDS - {'schedule'}
+_FINANCE_FALLBACK_WORDS = _FINANCE_WORDS - {'nasdaq', 'nyse', 'dow'}
+
+async def _first_abstract(client, queries: List[str], label: str, timeout: float = 8.0) -> Optional[str]:
+    """Fire all candidate DuckDuckGo queries concurrently and return the
+    first non-empty Abstract in priority order."""
+    urls = [
+        f"https://api.duckduckgo.com/?q={quote_plus(q)}&format=json&no_html=1"
+        for q in queries
+    ]
+    responses = await asyncio.gather(
+        *(client.get(url, timeout=timeout) for url in urls),
+        return_exceptions=True
+    )
+    for response in responses:
+        if isinstance(response, Exception) or response.status_code != 200:
+            continue
+        try:
+            data = orjson.loads(response.content)
+        except Exception:
+            continue
+        if data.get('Abstract'):
+            return f"{label}: {data['Abstract']}"
+    return None
+
+# TTL cache for web searches; entries hold the task performing the
+# search, so concurrent identical queries share one in-flight fan-out.
+# Fallback/error results get a much shorter TTL so pathological queries
+# retry soon without hammering DuckDuckGo in the meantime.
+_WEB_SEARCH_TTL = 300  # seconds
+_WEB_SEARCH_NEGATIVE_TTL = 60
+_WEB_SEARCH_CACHE_MAX = 1024
+_web_search_cache: dict = {}
+_web_search_stats = {"hits": 0, "misses": 0}
+
+def _web_search_entry_ttl(task: asyncio.Task) -> float:
+    """Finished negative results (no data / error) expire sooner."""
+    if task.done() and not task.cancelled():
+        try:
+            result = task.result()
+        except Exception:
+            return 0.0
+        if result.startswith(("WEB_SEARCH_NO_CURRENT_DATA", "Search error")):
+            return _WEB_SEARCH_NEGATIVE_TTL
+    return _WEB_SEARCH_TTL
 
-# Web search function using multiple sources
 async def web_search(query: str, max_results: int = 5) -> str:
+    """Cached front-end for _do_web_search keyed on the normalized query."""
+    key = query.strip().lower()
+    now = time.time()
+    entry = _web_search_cache.get(key)
+    if entry is not None:
+        ts, task = entry
+        if now - ts < _web_search_entry_ttl(task):
+            # shield: one disconnecting caller must not cancel the
+            # shared search
+            _web_search_stats["hits"] += 1
+            return await asyncio.shield(task)
+        del _web_search_cache[key]
+    _web_search_stats["misses"] += 1
+
+    if len(_web_search_cache) >= _WEB_SEARCH_CACHE_MAX:
+        oldest = min(_web_search_cache, key=lambda k: _web_search_cache[k][0])
+        del _web_search_cache[oldest]
+
+    task = asyncio.create_task(_do_web_search(query, max_results))
+    _web_search_cache[key] = (now, task)
+    return await asyncio.shield(task)
+
+# Web search function using multiple sources
+async def _do_web_search(query: str, max_results: int = 5) -> str:
     """Search the web and return relevant information"""
     try:
         results = []
-        
+
         # Try DuckDuckGo first
         search_url = f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
-        
-        # Configure httpx client with proper timeouts for web search
+
+        # Reuse the shared client; per-call timeout tuned for web search
         timeout = httpx.Timeout(10.0, connect=3.0, read=7.0, write=2.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(search_url)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Get abstract if available
-                if data.get('Abstract'):
-                    results.append(f"Summary: {data['Abstract']}")
-                
-                # Get related topics
-                if data.get('RelatedTopics'):
-                    for topic in data['RelatedTopics'][:3]:
-                        if isinstance(topic, dict) and topic.get('Text'):
-                            results.append(f"Related: {topic['Text']}")
+        client = app.state.http
+        response = await client.get(search_url, timeout=timeout)
+
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
             
-            # For sports queries, try additional sources
-            if any(word in query.lower() for word in ['barcelona', 'madrid', 'football', 'soccer', 'game', 'match', 'schedule']):
-                # Try multiple sports-specific searches
-                sports_searches = [
-                    f"{query} 2024 schedule fixture",
-                    f"{query} next match",
-                    f"{query} upcoming games",
-                    f"{query} la liga schedule",
-                    f"{query} champions league"
-                ]
-                
-                for sports_query in sports_searches:
-                    try:
-                        sports_url = f"https://api.duckduckgo.com/?q={quote_plus(sports_query)}&format=json&no_html=1"
-                        sports_response = await client.get(sports_url, timeout=8.0)
-                        if sports_response.status_code == 200:
-                            sports_data = sports_response.json()
-                            if sports_data.get('Abstract'):
-                                results.append(f"Sports Info: {sports_data['Abstract']}")
-                                break  # Use first successful result
-                    except:
-                        continue
+            # Get abstract if available
+            if data.get('Abstract'):
+                results.append(f"Summary: {data['Abstract']}")
             
-            # For financial queries, try additional sources
-            elif any(word in query.lower() for word in ['stock market', 'stock', 'market', 'trading', 'finance', 'financial', 'nasdaq', 'nyse', 'dow', 'crypto', 'bitcoin', 'ethereum']):
-                # Try multiple financial-specific searches
-                financial_searches = [
-                    f"{query} latest news",
-                    f"{query} current status",
-                    f"{query} market update",
-                    f"{query} trading today",
-                    f"{query} financial news",
-                    f"{query} price today",
-                    f"{query} market analysis"
-                ]
-                
-                for financial_query in financial_searches:
-                    try:
-                        financial_url = f"https://api.duckduckgo.com/?q={quote_plus(financial_query)}&format=json&no_html=1"
-                        financial_response = await client.get(financial_url, timeout=8.0)
-                        if financial_response.status_code == 200:
-                            financial_data = financial_response.json()
-                            if financial_data.get('Abstract'):
-                                results.append(f"Financial Info: {financial_data['Abstract']}")
-                                break  # Use first successful result
-                    except:
-                        continue
-                
+            # Get related topics
+            results.extend(
+                f"Related: {topic['Text']}"
+                for topic in data.get('RelatedTopics', [])[:3]
+                if isinstance(topic, dict) and topic.get('Text')
+            )
+        
+        query_lower = query.lower()
+        query_tokens = frozenset(_TOKEN_RE.findall(query_lower))
+
+        # For sports queries, try additional sources
+        if query_tokens & _SPORTS_WORDS:
+            # Fan out all sports-specific searches concurrently
+            sports_searches = [
+                f"{query} 2024 schedule fixture",
+                f"{query} next match",
+                f"{query} upcoming games",
+                f"{query} la liga schedule",
+                f"{query} champions league"
+            ]
+            sports_hit = await _first_abstract(client, sports_searches, "Sports Info")
+            if sports_hit:
+                results.append(sports_hit)
+
+        # For financial queries, try additional sources
+        elif query_tokens & _FINANCE_WORDS:
+            # Fan out all financial-specific searches concurrently, with
+            # the Wikipedia lookup running in the same batch
+            financial_searches = [
+                f"{query} latest news",
+                f"{query} current status",
+                f"{query} market update",
+                f"{query} trading today",
+                f"{query} financial news",
+                f"{query} price today",
+                f"{query} market analysis"
+            ]
+
+            async def wiki_summary():
                 # Try Wikipedia for team information
                 try:
-                    wiki_query = "FC Barcelona" if "barcelona" in query.lower() else query
+                    wiki_query = "FC Barcelona" if "barcelona" in query_lower else query
                     wiki_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{quote_plus(wiki_query)}"
                     wiki_response = await client.get(wiki_url, timeout=5.0)
                     if wiki_response.status_code == 200:
-                        wiki_data = wiki_response.json()
+                        wiki_data = orjson.loads(wiki_response.content)
                         if wiki_data.get('extract'):
                             # Extract relevant parts about current season
                             extract = wiki_data['extract']
                             if len(extract) > 200:
                                 extract = extract[:200] + "..."
-                            results.append(f"Team Info: {extract}")
+                            return f"Team Info: {extract}"
                 except:
                     pass
-            
-            # If still no results, try a general search
-            if not results:
-                general_searches = [
-                    f"{query} latest news",
-                    f"{query} current status",
-                    f"{query} today",
-                    f"{query} 2024",
-                    f"{query} recent"
-                ]
-                
-                for general_query in general_searches:
-                    try:
-                        general_url = f"https://api.duckduckgo.com/?q={quote_plus(general_query)}&format=json&no_html=1"
-                        general_response = await client.get(general_url, timeout=8.0)
-                        if general_response.status_code == 200:
-                            general_data = general_response.json()
-                            if general_data.get('Abstract'):
-                                results.append(f"Latest Info: {general_data['Abstract']}")
-                                break
-                    except:
-                        continue
-        
+                return None
+
+            financial_hit, wiki_hit = await asyncio.gather(
+                _first_abstract(client, financial_searches, "Financial Info"),
+                wiki_summary()
+            )
+            if financial_hit:
+                results.append(financial_hit)
+            if wiki_hit:
+                results.append(wiki_hit)
+
+        # If still no results, try a general search
+        if not results:
+            general_searches = [
+                f"{query} latest news",
+                f"{query} current status",
+                f"{query} today",
+                f"{query} 2024",
+                f"{query} recent"
+            ]
+            general_hit = await _first_abstract(client, general_searches, "Latest Info")
+            if general_hit:
+                results.append(general_hit)
+
         if results:
             return "\n".join(results)
         else:
             # Provide helpful fallback information for different query types
-            if any(word in query.lower() for word in ['barcelona', 'madrid', 'football', 'soccer', 'game', 'match']):
+            if query_tokens & _SPORTS_FALLBACK_WORDS:
                 return f"WEB_SEARCH_NO_CURRENT_DATA: I couldn't find current schedule information for '{query}'. For the most up-to-date schedules, please check:\n- Official FC Barcelona website\n- La Liga official website\n- ESPN FC\n- BBC Sport\n- Goal.com"
-            elif any(word in query.lower() for word in ['stock market', 'stock', 'market', 'trading', 'finance', 'financial', 'crypto', 'bitcoin', 'ethereum']):
+            elif query_tokens & _FINANCE_FALLBACK_WORDS:
                 return f"WEB_SEARCH_NO_CURRENT_DATA: I couldn't find current market data for '{query}'. For real-time market data, please check:\n- Yahoo Finance\n- Bloomberg\n- CNBC\n- MarketWatch\n- Reuters Finance\n- CoinGecko (for crypto)\n- CoinMarketCap (for crypto)"
             else:
                 return f"WEB_SEARCH_NO_CURRENT_DATA: I couldn't find current information about '{query}'. Please check official websites for the most up-to-date information."
@@ -254,28 +365,36 @@ async def web_search(query: str, max_results: int = 5) -> str:
     
     return "No information found."
 
+# Keywords that indicate a query needs real-time information from the web
+_SEARCH_KEYWORDS = [
+    'when is', 'next game', 'schedule', 'live', 'current', 'today', 'tomorrow',
+    'latest', 'news', 'weather', 'score', 'result', 'fixture', 'match',
+    'barcelona', 'real madrid', 'manchester', 'chelsea', 'arsenal', 'liverpool',
+    'champions league', 'premier league', 'la liga', 'serie a', 'bundesliga',
+    'world cup', 'euro', 'olympics', 'nba', 'nfl', 'mlb', 'nhl',
+    # Financial terms
+    'stock market', 'stock', 'market', 'trading', 'finance', 'financial',
+    'nasdaq', 'nyse', 'dow jones', 's&p', 'ftse', 'currency', 'forex',
+    # Technology and current events
+    'ai news', 'artificial intelligence', 'tech news', 'technology',
+    'crypto', 'bitcoin', 'ethereum', 'blockchain',
+    # General current information
+    'what is', 'tell me about', 'how is', 'what are', 'current',
+    'latest', 'recent', 'now', 'today', 'this week', 'this month'
+]
+
+# Compiled once: the regex engine scans the message in a single pass
+# instead of one Python-level substring scan per keyword
+_SEARCH_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, _SEARCH_KEYWORDS)) + r')\b',
+    re.IGNORECASE
+)
+
 # Function to detect if a query needs web search
+@functools.lru_cache(maxsize=4096)
 def needs_web_search(message: str) -> bool:
     """Detect if a message requires real-time information from the web"""
-    search_keywords = [
-        'when is', 'next game', 'schedule', 'live', 'current', 'today', 'tomorrow',
-        'latest', 'news', 'weather', 'score', 'result', 'fixture', 'match',
-        'barcelona', 'real madrid', 'manchester', 'chelsea', 'arsenal', 'liverpool',
-        'champions league', 'premier league', 'la liga', 'serie a', 'bundesliga',
-        'world cup', 'euro', 'olympics', 'nba', 'nfl', 'mlb', 'nhl',
-        # Financial terms
-        'stock market', 'stock', 'market', 'trading', 'finance', 'financial',
-        'nasdaq', 'nyse', 'dow jones', 's&p', 'ftse', 'currency', 'forex',
-        # Technology and current events
-        'ai news', 'artificial intelligence', 'tech news', 'technology',
-        'crypto', 'bitcoin', 'ethereum', 'blockchain',
-        # General current information
-        'what is', 'tell me about', 'how is', 'what are', 'current',
-        'latest', 'recent', 'now', 'today', 'this week', 'this month'
-    ]
-    
-    message_lower = message.lower()
-    return any(keyword in message_lower for keyword in search_keywords)
+    return _SEARCH_RE.search(message) is not None
 
 # Web search endpoint for testing
 @app.get("/api/web_search")
@@ -287,6 +406,16 @@ async def search_web(query: str):
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+# Web search cache statistics
+@app.get("/api/web_search_cache_stats")
+async def web_search_cache_stats():
+    return {
+        "status": "ok",
+        "hits": _web_search_stats["hits"],
+        "misses": _web_search_stats["misses"],
+        "size": len(_web_search_cache)
+    }
+
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
@@ -295,15 +424,13 @@ async def health_check():
 # DB status endpoint
 @app.get("/api/db_status")
 async def db_status():
-    import time
-    start = time.time()
+    start = time.perf_counter()
     try:
-        conn = await asyncpg.connect(DATABASE_URL)
-        count = await conn.fetchval("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public';")
-        session_count = await conn.fetchval("SELECT COUNT(*) FROM chat_sessions;")
-        message_count = await conn.fetchval("SELECT COUNT(*) FROM messages;")
-        await conn.close()
-        elapsed = time.time() - start
+        async with app.state.pg.acquire() as conn:
+            count = await conn.fetchval("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public';")
+            session_count = await conn.fetchval("SELECT COUNT(*) FROM chat_sessions;")
+            message_count = await conn.fetchval("SELECT COUNT(*) FROM messages;")
+        elapsed = time.perf_counter() - start
         return {
             "status": "ok",
             "table_count": count,
@@ -312,127 +439,192 @@ async def db_status():
             "response_time": elapsed
         }
     except Exception as e:
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
         return {"status": "error", "error": str(e), "response_time": elapsed}
 
 # Ollama status endpoint
 @app.get("/api/ollama_status")
 async def ollama_status():
     try:
-        start_time = time.time()
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{OLLAMA_URL}/api/tags")
-            elapsed = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                models = data.get("models", [])
-                return {
-                    "status": "ok", 
-                    "models": [model["name"] for model in models],
-                    "response_time": elapsed
-                }
-            else:
-                return {"status": "error", "error": resp.text}
+        start_time = time.perf_counter()
+        resp = await app.state.http.get(f"{OLLAMA_URL}/api/tags", timeout=5.0)
+        elapsed = time.perf_counter() - start_time
+
+        if resp.status_code == 200:
+            data = orjson.loads(resp.content)
+            models = data.get("models", [])
+            return {
+                "status": "ok",
+                "models": [model["name"] for model in models],
+                "response_time": elapsed
+            }
+        else:
+            return {"status": "error", "error": resp.text}
     except Exception as e:
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         return {"status": "error", "error": str(e)}
 
-# Global cache for docker statistics
-_docker_stats_cache: list = []
+# Global cache for docker statistics: container id -> latest sample,
+# fed continuously by one streaming stats task per container
+_docker_stats_cache: dict = {}
 _docker_stats_ts: float = 0.0
 _docker_stats_lock: asyncio.Lock = asyncio.Lock()
+_docker_stat_tasks: dict = {}
+# Pulsed (set then cleared) whenever a fresh sample lands, so WS
+# subscribers wake on new data instead of polling on a timer
+_docker_stats_event: asyncio.Event = asyncio.Event()
+
+def _stats_entry(name: str, status: str, s: dict) -> dict:
+    """Turn one raw stats sample into the cache/response shape."""
+    cpu_percent = 0.0
+    if 'cpu_stats' in s and 'precpu_stats' in s:
+        cpu_delta = s['cpu_stats']['cpu_usage']['total_usage'] - s['precpu_stats']['cpu_usage']['total_usage']
+        system_delta = s['cpu_stats']['system_cpu_usage'] - s['precpu_stats']['system_cpu_usage']
+        if system_delta > 0.0:
+            cpu_count = len(s['cpu_stats']['cpu_usage'].get('percpu_usage', [1])) or 1
+            cpu_percent = (cpu_delta / system_delta) * cpu_count * 100.0
+    mem_usage = s['memory_stats']['usage']
+    mem_limit = s['memory_stats'].get('limit', 1)
+    mem_percent = (mem_usage / mem_limit) * 100.0 if mem_limit else 0.0
+    return {
+        'name': name,
+        'status': status,
+        'cpu_percent': round(cpu_percent, 2),
+        'mem_usage': mem_usage,
+        'mem_limit': mem_limit,
+        'mem_percent': round(mem_percent, 2)
+    }
+
+async def _stream_container_stats(container: dict):
+    """Consume the Docker streaming stats endpoint for one container,
+    keeping the latest parsed sample in the shared cache. Docker emits a
+    sample per second with the CPU deltas precomputed, so no per-poll
+    double sampling is needed."""
+    global _docker_stats_ts
+    cid = container['Id']
+    name = container.get('Names', ['/?'])[0].lstrip('/')
+    status = container.get('State', 'unknown')
+    client = app.state.docker_http
+    try:
+        async with client.stream(
+            "GET",
+            f"/containers/{cid}/stats",
+            params={'stream': 'true'},
+            timeout=httpx.Timeout(None, connect=10.0),
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                try:
+                    s = orjson.loads(line)
+                    entry = _stats_entry(name, status, s)
+                except Exception:
+                    continue
+                async with _docker_stats_lock:
+                    _docker_stats_cache[cid] = entry
+                    _docker_stats_ts = time.time()
+                # set+clear wakes every current waiter exactly once
+                _docker_stats_event.set()
+                _docker_stats_event.clear()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        async with _docker_stats_lock:
+            _docker_stats_cache[cid] = {'name': name, 'status': status, 'error': str(e)}
 
 async def _collect_docker_stats() -> list:
-    """Heavy operation that queries Docker for container stats."""
-    client = docker.DockerClient(base_url='unix://var/run/docker.sock')
-    containers = await asyncio.to_thread(client.containers.list)
+    """One-shot fallback used before the streaming tasks have produced
+    their first samples."""
+    client = app.state.docker_http
+    resp = await client.get("/containers/json", timeout=10.0)
+    resp.raise_for_status()
+    containers = orjson.loads(resp.content)
 
     async def container_stats(c):
+        name = c.get('Names', ['/?'])[0].lstrip('/')
+        status = c.get('State', 'unknown')
         try:
-            s = await asyncio.to_thread(c.stats, stream=False)
-            cpu_percent = 0.0
-            if 'cpu_stats' in s and 'precpu_stats' in s:
-                cpu_delta = s['cpu_stats']['cpu_usage']['total_usage'] - s['precpu_stats']['cpu_usage']['total_usage']
-                system_delta = s['cpu_stats']['system_cpu_usage'] - s['precpu_stats']['system_cpu_usage']
-                if system_delta > 0.0:
-                    cpu_count = len(s['cpu_stats']['cpu_usage'].get('percpu_usage', [1])) or 1
-                    cpu_percent = (cpu_delta / system_delta) * cpu_count * 100.0
-            mem_usage = s['memory_stats']['usage']
-            mem_limit = s['memory_stats'].get('limit', 1)
-            mem_percent = (mem_usage / mem_limit) * 100.0 if mem_limit else 0.0
-            return {
-                'name': c.name,
-                'status': c.status,
-                'cpu_percent': round(cpu_percent, 2),
-                'mem_usage': mem_usage,
-                'mem_limit': mem_limit,
-                'mem_percent': round(mem_percent, 2)
-            }
+            r = await client.get(
+                f"/containers/{c['Id']}/stats",
+                params={'stream': 'false'},
+                timeout=10.0,
+            )
+            r.raise_for_status()
+            return _stats_entry(name, status, orjson.loads(r.content))
         except Exception as e:
             return {
-                'name': c.name,
-                'status': c.status,
+                'name': name,
+                'status': status,
                 'error': str(e)
             }
 
     return await asyncio.gather(*(container_stats(c) for c in containers))
 
 async def _docker_stats_refresher():
-    """Background task to refresh docker stats every 15 s."""
-    global _docker_stats_cache, _docker_stats_ts
+    """Reconcile one streaming stats task per running container, re-listing
+    every 30 s to pick up added/removed containers."""
     while True:
         try:
-            data = await _collect_docker_stats()
-            async with _docker_stats_lock:
-                _docker_stats_cache = data
-                _docker_stats_ts = time.time()
+            client = app.state.docker_http
+            resp = await client.get("/containers/json", timeout=10.0)
+            resp.raise_for_status()
+            current = {c['Id']: c for c in orjson.loads(resp.content)}
+
+            # Start streams for new containers (or restart dead ones)
+            for cid, container in current.items():
+                task = _docker_stat_tasks.get(cid)
+                if task is None or task.done():
+                    _docker_stat_tasks[cid] = asyncio.create_task(_stream_container_stats(container))
+
+            # Drop streams and samples for containers that went away
+            for cid in list(_docker_stat_tasks):
+                if cid not in current:
+                    _docker_stat_tasks.pop(cid).cancel()
+                    async with _docker_stats_lock:
+                        _docker_stats_cache.pop(cid, None)
         except Exception as e:
             # Log but continue
-            print(f"⚠️  Docker stats refresher error: {e}")
-        await asyncio.sleep(15)
+            logger.warning(f"Docker stats refresher error: {e}")
+        await asyncio.sleep(30)
 
 # Docker stats endpoint
 @app.get("/api/docker_stats")
 async def docker_stats():
-    import time
-    start = time.time()
-    global _docker_stats_cache, _docker_stats_ts
+    start = time.perf_counter()
     async with _docker_stats_lock:
-        cache = _docker_stats_cache
+        cache = list(_docker_stats_cache.values())
     if cache:
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
         return {'status': 'ok', 'containers': cache, 'response_time': elapsed, 'cached': True}
-    # If no cache yet (first run), compute synchronously
+    # If the streams haven't produced samples yet (first run), compute synchronously
     try:
         data = await _collect_docker_stats()
-        elapsed = time.time() - start
-        async with _docker_stats_lock:
-            _docker_stats_cache = data
-            _docker_stats_ts = time.time()
+        elapsed = time.perf_counter() - start
         return {'status': 'ok', 'containers': data, 'response_time': elapsed, 'cached': False}
     except Exception as e:
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
         return {'status': 'error', 'error': str(e), 'response_time': elapsed}
 
 # Chat sessions endpoints
 @app.get("/api/sessions")
 async def get_sessions():
     try:
-        conn = await asyncpg.connect(DATABASE_URL)
-        rows = await conn.fetch("""
-            SELECT id, title, created_at, updated_at 
-            FROM chat_sessions 
-            ORDER BY updated_at DESC
-        """)
-        await conn.close()
+        async with app.state.pg.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id, title, created_at, updated_at
+                FROM chat_sessions
+                ORDER BY updated_at DESC
+            """)
+        # Plain dicts straight from the records; orjson handles the
+        # UUID/datetime values without a Pydantic pass
         sessions = [
-            Session(
-                id=str(row['id']),
-                title=row['title'] or f"Chat {i+1}",
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
+            {
+                "id": row['id'],
+                "title": row['title'] or f"Chat {i+1}",
+                "created_at": row['created_at'],
+                "updated_at": row['updated_at']
+            }
             for i, row in enumerate(rows)
         ]
         return {"status": "ok", "sessions": sessions}
@@ -442,193 +634,329 @@ async def get_sessions():
 @app.post("/api/sessions")
 async def create_session(session: SessionCreate):
     try:
-        conn = await asyncpg.connect(DATABASE_URL)
-        session_id = await conn.fetchval("""
-            INSERT INTO chat_sessions (title) 
-            VALUES ($1) 
-            RETURNING id
-        """, session.title or f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        await conn.close()
+        async with app.state.pg.acquire() as conn:
+            session_id = await conn.fetchval("""
+                INSERT INTO chat_sessions (title)
+                VALUES ($1)
+                RETURNING id
+            """, session.title or f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         return {"status": "ok", "session_id": str(session_id)}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 @app.get("/api/sessions/{session_id}/messages")
-async def get_session_messages(session_id: str):
+async def get_session_messages(session_id: uuid.UUID):
+    # Typed path param: FastAPI rejects malformed ids with a 422 before
+    # we touch the pool, and asyncpg takes the UUID object natively
     try:
-        conn = await asyncpg.connect(DATABASE_URL)
-        rows = await conn.fetch("""
-            SELECT id, session_id, role, content, created_at, performance_data 
-            FROM messages 
-            WHERE session_id = $1 
-            ORDER BY created_at ASC
-        """, session_id)
-        await conn.close()
+        async with app.state.pg.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id, session_id, role, content, created_at, performance_data
+                FROM messages
+                WHERE session_id = $1
+                ORDER BY created_at ASC
+            """, session_id)
         messages = [
-            Message(
-                id=str(row['id']),
-                session_id=str(row['session_id']),
-                role=row['role'],
-                content=row['content'],
-                created_at=row['created_at'],
-                performance_data=row['performance_data']
-            )
+            {
+                "id": row['id'],
+                "session_id": row['session_id'],
+                "role": row['role'],
+                "content": row['content'],
+                "created_at": row['created_at'],
+                "performance_data": _parse_performance_data(row['performance_data'])
+            }
             for row in rows
         ]
         return {"status": "ok", "messages": messages}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
-# Enhanced chat endpoint with memory and web search
-@app.post("/api/ollama_chat")
-async def ollama_chat(req: ChatRequest):
-    try:
-        # Log the model being used
-        selected_model = req.model or "mistral:7b"
-        
-        conn = await asyncpg.connect(DATABASE_URL)
-        
+async def _prepare_prompt(req: ChatRequest) -> str:
+    """Store the user message, gather context/web results and build the
+    full LLM prompt. Creates the session if one was not provided."""
+    async with app.state.pg.acquire() as conn:
         # Create session if not provided
         if not req.session_id:
             session_id = await conn.fetchval("""
-                INSERT INTO chat_sessions (title) 
-                VALUES ($1) 
+                INSERT INTO chat_sessions (title)
+                VALUES ($1)
                 RETURNING id
             """, f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}")
             req.session_id = str(session_id)
-        
-        # Store user message
-        user_embedding = get_embedding(req.message)
-        await conn.execute("""
-            INSERT INTO messages (session_id, role, content, embedding) 
-            VALUES ($1, $2, $3, $4)
-        """, req.session_id, 'user', req.message, user_embedding)
-        
-        # Check if web search is needed
-        web_info = ""
-        if needs_web_search(req.message):
-            web_info = await web_search(req.message)
-            web_info = f"\n[Web Search Results: {web_info}]\n"
-        
+
         # Get relevant context from previous conversations
+        # (the user message itself is appended to the prompt below and
+        # stored together with the AI reply in one batched insert)
+        # The CTE grabs the 10 newest rows, then the outer query flips
+        # them back to chronological order and maps the role to its
+        # prompt label, so Python just joins the rows
         context_messages = await conn.fetch("""
-            SELECT content, role 
-            FROM messages 
-            WHERE session_id = $1 
-            ORDER BY created_at DESC 
-            LIMIT 10
+            WITH recent AS (
+                SELECT content, role, created_at
+                FROM messages
+                WHERE session_id = $1
+                ORDER BY created_at DESC
+                LIMIT 10
+            )
+            SELECT CASE WHEN role = 'user' THEN 'USER' ELSE 'ASSISTANT' END AS label,
+                   content
+            FROM recent
+            ORDER BY created_at ASC
         """, req.session_id)
-        
-        # Build context for LLM
-        context = ""
-        if context_messages:
-            context = "Previous conversation:\n"
-            for msg in reversed(context_messages):
-                context += f"{msg['role'].upper()}: {msg['content']}\n"
-            context += "\nCurrent conversation:\n"
-        
-        # Prepare prompt with context and web search results (NO SYSTEM PROMPT)
-        full_prompt = f"{context}{web_info}USER: {req.message}\nASSISTANT:"
-        
-        # Call Ollama
-        # Configure httpx client with proper timeouts for longer generation requests
-        # Use longer timeout for llama3.1:latest model
-        if selected_model == 'llama3.1:latest':
-            timeout = httpx.Timeout(300.0, connect=10.0, read=290.0, write=10.0)  # 5 minutes for llama3.1
+
+    # Check if web search is needed
+    web_info = ""
+    if needs_web_search(req.message):
+        web_info = await web_search(req.message)
+        web_info = f"\n[Web Search Results: {web_info}]\n"
+
+    # Build context for LLM
+    context = ""
+    if context_messages:
+        parts = ["Previous conversation:"]
+        parts.extend(f"{msg['label']}: {msg['content']}" for msg in context_messages)
+        parts.append("\nCurrent conversation:\n")
+        context = "\n".join(parts)
+
+    # Prepare prompt with context and web search results (NO SYSTEM PROMPT)
+    return f"{context}{web_info}USER: {req.message}\nASSISTANT:"
+
+# Keep strong references to in-flight persistence tasks so they aren't
+# garbage-collected before completing
+_background_tasks: set = set()
+
+async def _persist_chat_turn(session_id: str, user_message: str, ai_response: str,
+                             performance_data: Optional[dict] = None):
+    """Store the user message and AI reply in one multi-row insert and bump
+    the session timestamp, all in a single transaction."""
+    try:
+        # Model inference is blocking CPU work; run both lookups in a
+        # worker thread so a loaded model can't stall the event loop
+        user_embedding, ai_embedding = await asyncio.to_thread(
+            lambda: (get_embedding(user_message), get_embedding(ai_response))
+        )
+        async with app.state.pg.acquire() as conn:
+            # Single data-modifying CTE: both message rows plus the
+            # session-timestamp bump in one atomic statement/round trip.
+            # clock_timestamp() keeps the user message ordered before
+            # the reply.
+            await conn.execute("""
+                WITH ins AS (
+                    INSERT INTO messages (session_id, role, content, embedding, performance_data, created_at)
+                    VALUES ($1, 'user', $2, $3, NULL, clock_timestamp()),
+                           ($1, 'ai', $4, $5, $6, clock_timestamp())
+                )
+                UPDATE chat_sessions
+                SET updated_at = NOW()
+                WHERE id = $1
+            """, session_id, user_message, user_embedding,
+                 ai_response, ai_embedding, performance_data)
+    except Exception as e:
+        logger.warning(f"Chat turn persistence error: {e}")
+
+def _persist_chat_turn_background(session_id: str, user_message: str, ai_response: str,
+                                  performance_data: Optional[dict] = None):
+    """Fire-and-forget wrapper around _persist_chat_turn."""
+    task = asyncio.create_task(_persist_chat_turn(session_id, user_message, ai_response, performance_data))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+def _generation_timeout(model: str) -> httpx.Timeout:
+    """Per-call timeouts for generation requests; llama3.1 needs longer."""
+    if model == 'llama3.1:latest':
+        return httpx.Timeout(300.0, connect=10.0, read=290.0, write=10.0)  # 5 minutes for llama3.1
+    return httpx.Timeout(60.0, connect=5.0, read=55.0, write=5.0)
+
+def _performance_stats(data: dict) -> Optional[dict]:
+    """Convert the timing counters on Ollama's final response (shared by
+    the buffered and streaming paths) from nanoseconds to seconds."""
+    total_duration = data.get("total_duration", 0)
+    if not total_duration:
+        return None
+    load_duration = data.get("load_duration", 0)
+    prompt_eval_count = data.get("prompt_eval_count", 0)
+    prompt_eval_duration = data.get("prompt_eval_duration", 0)
+    eval_count = data.get("eval_count", 0)
+    eval_duration = data.get("eval_duration", 0)
+
+    prompt_eval_duration_s = prompt_eval_duration / 1_000_000_000
+    eval_duration_s = eval_duration / 1_000_000_000
+    return {
+        "total_duration": total_duration / 1_000_000_000,
+        "load_duration": load_duration / 1_000_000_000,
+        "prompt_eval_count": prompt_eval_count,
+        "prompt_eval_duration": prompt_eval_duration_s,
+        "eval_count": eval_count,
+        "eval_duration": eval_duration_s,
+        "prompt_rate": prompt_eval_count / prompt_eval_duration_s if prompt_eval_duration_s > 0 else 0,
+        "eval_rate": eval_count / eval_duration_s if eval_duration_s > 0 else 0
+    }
+
+# Enhanced chat endpoint with memory and web search
+@app.post("/api/ollama_chat")
+async def ollama_chat(req: ChatRequest):
+    try:
+        # Log the model being used
+        selected_model = req.model or "mistral:7b"
+
+        full_prompt = await _prepare_prompt(req)
+        timeout = _generation_timeout(selected_model)
+        resp = await app.state.http.post(
+            f"{OLLAMA_URL}/api/generate",
+            json={
+                "model": selected_model,
+                "prompt": full_prompt,
+                "stream": False
+            },
+            timeout=timeout,
+        )
+
+        if resp.status_code == 200:
+            data = orjson.loads(resp.content)
+            ai_response = data.get("response", "")
+
+            # Persist off the critical path; the client gets the reply
+            # without waiting for the embedding + DB writes
+            _persist_chat_turn_background(req.session_id, req.message, ai_response,
+                                          _performance_stats(data))
+
+            return {"status": "ok", "response": ai_response, "session_id": req.session_id}
         else:
-            timeout = httpx.Timeout(60.0, connect=5.0, read=55.0, write=5.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.post(
+            return {"status": "error", "error": resp.text}
+
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+# Streaming chat endpoint: tokens are forwarded as Ollama produces them,
+# so first-token latency replaces full-generation latency
+@app.post("/api/ollama_chat_stream")
+async def ollama_chat_stream(req: ChatRequest):
+    selected_model = req.model or "mistral:7b"
+    try:
+        full_prompt = await _prepare_prompt(req)
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    timeout = _generation_timeout(selected_model)
+    session_id = req.session_id
+
+    async def event_stream():
+        chunks = []
+        performance_data = None
+        try:
+            async with app.state.http.stream(
+                "POST",
                 f"{OLLAMA_URL}/api/generate",
                 json={
                     "model": selected_model,
                     "prompt": full_prompt,
-                    "stream": False
+                    "stream": True
                 },
-            )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                ai_response = data.get("response", "")
-                
-                # Log verbose performance data
-                total_duration = data.get("total_duration", 0)
-                load_duration = data.get("load_duration", 0)
-                prompt_eval_count = data.get("prompt_eval_count", 0)
-                prompt_eval_duration = data.get("prompt_eval_duration", 0)
-                eval_count = data.get("eval_count", 0)
-                eval_duration = data.get("eval_duration", 0)
-                
-                if total_duration > 0:
-                    # Convert from nanoseconds to seconds
-                    total_duration_s = total_duration / 1_000_000_000
-                    load_duration_s = load_duration / 1_000_000_000
-                    prompt_eval_duration_s = prompt_eval_duration / 1_000_000_000
-                    eval_duration_s = eval_duration / 1_000_000_000
-                    
-                    prompt_rate = prompt_eval_count / prompt_eval_duration_s if prompt_eval_duration_s > 0 else 0
-                    eval_rate = eval_count / eval_duration_s if eval_duration_s > 0 else 0
-                
-                # Store AI response with performance data
-                ai_embedding = get_embedding(ai_response)
-                performance_json = None
-                if total_duration > 0:
-                    performance_json = {
-                        "total_duration": total_duration_s,
-                        "load_duration": load_duration_s,
-                        "prompt_eval_count": prompt_eval_count,
-                        "prompt_eval_duration": prompt_eval_duration_s,
-                        "eval_count": eval_count,
-                        "eval_duration": eval_duration_s,
-                        "prompt_rate": prompt_rate,
-                        "eval_rate": eval_rate
-                    }
-                if performance_json is not None:
-                    performance_json = json.dumps(performance_json)
-                
-                await conn.execute("""
-                    INSERT INTO messages (session_id, role, content, embedding, performance_data) 
-                    VALUES ($1, $2, $3, $4, $5)
-                """, req.session_id, 'ai', ai_response, ai_embedding, performance_json)
-                
-                # Update session timestamp
-                await conn.execute("""
-                    UPDATE chat_sessions 
-                    SET updated_at = NOW() 
-                    WHERE id = $1
-                """, req.session_id)
-                
-                await conn.close()
-                return {"status": "ok", "response": ai_response, "session_id": req.session_id}
-            else:
-                await conn.close()
-                return {"status": "error", "error": resp.text}
-                
-    except Exception as e:
-        return {"status": "error", "error": str(e)}
+                timeout=timeout,
+            ) as resp:
+                if resp.status_code != 200:
+                    # e.g. unknown model -> Ollama 404; mirror ollama_chat's
+                    # error shape instead of streaming the error body as tokens
+                    body = await resp.aread()
+                    yield orjson.dumps(
+                        {"status": "error", "error": body.decode(errors="replace")}
+                    ).decode()
+                    return
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    try:
+                        data = orjson.loads(line)
+                    except (orjson.JSONDecodeError, TypeError):
+                        continue
+                    if data.get("error"):
+                        # Ollama reports mid-generation failures in-stream
+                        yield orjson.dumps(
+                            {"status": "error", "error": data["error"]}
+                        ).decode()
+                        return
+                    token = data.get("response", "")
+                    if token:
+                        chunks.append(token)
+                        yield token
+                    if data.get("done"):
+                        # The final line carries the generation timing
+                        # counters, same as the buffered response
+                        performance_data = _performance_stats(data)
+                        break
+        except Exception as e:
+            # The status line is already sent, so surface the failure as
+            # a terminal payload instead of silently truncating
+            yield orjson.dumps({"status": "error", "error": str(e)}).decode()
+            return
+
+        # Persist the full turn once generation completes; nothing to
+        # store if the stream produced no tokens
+        if chunks:
+            await _persist_chat_turn(session_id, req.message, "".join(chunks),
+                                     performance_data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/plain",
+        headers={"X-Session-Id": session_id},
+    )
 
-# Startup event to initialize database
 @app.on_event("startup")
 async def startup_event():
-    await init_db()
-    # start docker stats refresher
-    asyncio.create_task(_docker_stats_refresher())
+    app.state.pg = await create_db_pool()
+    # Shared HTTP client: keepalive connections amortize TCP/TLS setup
+    # across Ollama and web-search calls
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        # DuckDuckGo/Wikipedia speak HTTP/2, so the fan-out queries
+        # multiplex over one TLS connection per host
+        http2=True,
+    )
+    # Dedicated client for the Docker Engine API over its unix socket
+    app.state.docker_http = httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(uds="/var/run/docker.sock"),
+        base_url="http://docker",
+        timeout=10.0,
+    )
+    # start docker stats refresher; keep the handle so shutdown can
+    # cancel it (and so it isn't garbage-collected mid-flight)
+    app.state.docker_stats_refresher = asyncio.create_task(_docker_stats_refresher())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.docker_stats_refresher.cancel()
+    for task in _docker_stat_tasks.values():
+        task.cancel()
+    await app.state.http.aclose()
+    await app.state.docker_http.aclose()
+    await app.state.pg.close()
 
 # ---------------- WebSocket live stream -----------------
 
 @app.websocket("/ws/docker_stats")
 async def websocket_docker_stats(ws: WebSocket):
-    """Continuously stream docker container stats to the client."""
+    """Continuously stream docker container stats to the client.
+
+    Reads the shared cache maintained by the background refresher, so
+    any number of subscribers costs a single Docker fan-out."""
     await ws.accept()
     try:
         while True:
-            data = await _collect_docker_stats()
-            await ws.send_json({"ts": time.time(), "containers": data})
-            await asyncio.sleep(2)  # adjust interval as needed
+            async with _docker_stats_lock:
+                snapshot = list(_docker_stats_cache.values())
+                ts = _docker_stats_ts
+            await ws.send_json({"ts": ts, "containers": snapshot})
+            # Wake as soon as the next sample lands; the timeout is only
+            # a keepalive for when no containers are producing samples
+            try:
+                await asyncio.wait_for(_docker_stats_event.wait(), timeout=15.0)
+            except asyncio.TimeoutError:
+                pass
     except WebSocketDisconnect:
-        print("🛑 Docker stats WS disconnected")
+        logger.info("Docker stats WS disconnected")
     except Exception as e:
-        print(f"⚠️  Docker stats WS error: {e}")
+        logger.warning(f"Docker stats WS error: {e}")
 
 if __name__ == "__main__":
     import uvicorn
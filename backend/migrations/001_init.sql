@@ -0,0 +1,45 @@
+-- Initial schema. Idempotent: safe to re-run on existing databases.
+-- Applied by the `migrate` compose service before the API starts, so
+-- app startup no longer serializes behind DDL locks.
+
+-- Serialize concurrent init attempts across replicas
+SELECT pg_advisory_lock(42);
+
+-- Enable vector extension
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- Chat sessions table
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    title TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Messages table with vector embeddings and performance data
+CREATE TABLE IF NOT EXISTS messages (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    session_id UUID REFERENCES chat_sessions(id) ON DELETE CASCADE,
+    role TEXT NOT NULL CHECK (role IN ('user', 'ai')),
+    content TEXT NOT NULL,
+    embedding vector(384),
+    performance_data JSONB,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Index for vector similarity search. HNSW needs no training phase and
+-- keeps good recall on small tables, unlike ivfflat with a fixed lists.
+-- Indexing the half-precision cast halves index memory/IO; the column
+-- stays full precision, so recall loss is limited to the index probe.
+CREATE INDEX IF NOT EXISTS messages_embedding_hnsw_idx
+ON messages
+USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Covers the per-session history queries
+-- (WHERE session_id = $1 ORDER BY created_at ... LIMIT n):
+-- index range-scan instead of scan + sort as sessions grow
+CREATE INDEX IF NOT EXISTS messages_session_created_idx
+ON messages (session_id, created_at DESC);
+
+SELECT pg_advisory_unlock(42);
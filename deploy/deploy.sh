@@ -31,6 +31,28 @@ warn() {
     echo -e "${YELLOW}[$(date +'%Y-%m-%d %H:%M:%S')] WARNING: $1${NC}" | tee -a "$LOG_FILE"
 }
 
+# Poll a URL until it responds or the deadline passes, instead of
+# sleeping a fixed worst-case interval
+wait_for_url() {
+    local url="$1"
+    local name="$2"
+    local deadline=$(( $(date +%s) + ${3:-60} ))
+    local delay=0.25
+
+    while (( $(date +%s) < deadline )); do
+        if curl -sf --max-time 2 "$url" > /dev/null 2>&1; then
+            log "$name is ready"
+            return 0
+        fi
+        sleep "$delay"
+        # Exponential backoff capped at 2s
+        delay=$(awk -v d="$delay" 'BEGIN { print (d*2 > 2) ? 2 : d*2 }')
+    done
+
+    warn "$name not ready after timeout"
+    return 1
+}
+
 # Check if running as root
 check_root() {
     if [[ $EUID -eq 0 ]]; then
@@ -96,12 +118,7 @@ download_model() {
     
     # Wait for Ollama to be ready
     log "Waiting for Ollama to be ready..."
-    for i in {1..30}; do
-        if curl -s http://localhost:11434/api/tags > /dev/null 2>&1; then
-            break
-        fi
-        sleep 2
-    done
+    wait_for_url "http://localhost:11434/api/tags" "Ollama" 60 || true
     
     # Check if model exists
     if docker exec "${PROJECT_NAME}-ollama-1" ollama list | grep -q "mistral:7b"; then
@@ -119,8 +136,13 @@ start_services() {
     docker-compose -f "$COMPOSE_FILE" up -d
     
     log "Waiting for services to be ready..."
-    sleep 10
-    
+    # Poll the three entry points in parallel rather than sleeping a
+    # fixed 10s; each waiter exits as soon as its service answers
+    wait_for_url "http://localhost:8000/api/health" "Backend" 60 &
+    wait_for_url "http://localhost" "Frontend" 60 &
+    wait_for_url "http://localhost:11434/api/tags" "Ollama" 60 &
+    wait || true
+
     # Check service health
     check_health
 }
@@ -191,7 +213,13 @@ rollback() {
     if [[ -n "$LATEST_BACKUP" ]]; then
         log "Restoring from backup: $LATEST_BACKUP"
         docker-compose -f "$COMPOSE_FILE" up -d db
-        sleep 10
+        # Wait for Postgres to accept connections instead of a blind sleep
+        for i in {1..30}; do
+            if docker-compose -f "$COMPOSE_FILE" exec -T db pg_isready -U postgres > /dev/null 2>&1; then
+                break
+            fi
+            sleep 1
+        done
         docker-compose -f "$COMPOSE_FILE" exec -T db psql -U postgres postgres < "$LATEST_BACKUP"
     fi
     
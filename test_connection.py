@@ -1,24 +1,44 @@
 import httpx
 import asyncio
+import os
 import time
 
-async def test_ollama_connection():
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+
+# (name, url) pairs probed concurrently over one shared client
+PROBES = [
+    ("ollama", f"{OLLAMA_URL}/api/tags"),
+    ("backend health", f"{BACKEND_URL}/api/health"),
+    ("db status", f"{BACKEND_URL}/api/db_status"),
+    ("ollama status", f"{BACKEND_URL}/api/ollama_status"),
+    ("docker stats", f"{BACKEND_URL}/api/docker_stats"),
+]
+
+async def probe(client, name, url):
     start = time.time()
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get('http://ollama:11434/api/tags', timeout=5.0)
-            elapsed = time.time() - start
-            print(f"Status: {resp.status_code}")
-            print(f"Response time: {elapsed:.2f}s")
-            if resp.status_code == 200:
-                data = resp.json()
-                print(f"Models: {data.get('models', [])}")
-            return resp.status_code == 200
+        resp = await client.get(url, timeout=5.0)
+        elapsed = time.time() - start
+        print(f"[{name}] Status: {resp.status_code} ({elapsed:.2f}s)")
+        if name == "ollama" and resp.status_code == 200:
+            data = resp.json()
+            print(f"[{name}] Models: {data.get('models', [])}")
+        return resp.status_code == 200
     except Exception as e:
         elapsed = time.time() - start
-        print(f"Error: {e}")
-        print(f"Time elapsed: {elapsed:.2f}s")
+        print(f"[{name}] Error: {e} ({elapsed:.2f}s)")
         return False
 
+async def test_connections():
+    # One client, all probes in flight at once: total wall time is the
+    # slowest endpoint, not the sum of them
+    async with httpx.AsyncClient() as client:
+        results = await asyncio.gather(
+            *(probe(client, name, url) for name, url in PROBES)
+        )
+    print(f"{sum(results)}/{len(results)} probes ok")
+    return all(results)
+
 if __name__ == "__main__":
-    asyncio.run(test_ollama_connection()) 
\ No newline at end of file
+    asyncio.run(test_connections())